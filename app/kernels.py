@@ -0,0 +1,86 @@
+"""
+Compiled kernels for applying a calculation to many operand pairs at once.
+
+CalculationFactory.calculate dispatches through Python for every (a, b)
+pair, which is fine per request but slow when recomputing results in bulk
+(e.g. for analytics). bulk_calculate runs the same four operations as a
+Numba-compiled loop over NumPy arrays, parallelized across cores.
+
+NumPy and Numba are optional; install them with the ``analytics`` extra
+(``pip install .[analytics]``) to use this module.
+"""
+import numpy as np
+from numba import njit, prange
+
+from app.factory import (
+    CalculationFactory,
+    AddOperation,
+    SubtractOperation,
+    MultiplyOperation,
+    DivideOperation,
+)
+
+# Kernel branch for each operation class. Keyed by class rather than name so
+# the factory stays the only registry of operation types; a type registered
+# there without an entry here is rejected by bulk_calculate.
+OPERATION_CODES = {
+    AddOperation: 0,
+    SubtractOperation: 1,
+    MultiplyOperation: 2,
+    DivideOperation: 3,
+}
+
+
+@njit(parallel=True, cache=True)
+def _bulk_calc(op_code: int, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Apply the operation for op_code element-wise to a and b."""
+    n = a.shape[0]
+    result = np.empty(n, dtype=np.float64)
+    # Branch once outside the loop so each loop body is a single operation
+    if op_code == 0:
+        for i in prange(n):
+            result[i] = a[i] + b[i]
+    elif op_code == 1:
+        for i in prange(n):
+            result[i] = a[i] - b[i]
+    elif op_code == 2:
+        for i in prange(n):
+            result[i] = a[i] * b[i]
+    else:
+        for i in prange(n):
+            result[i] = a[i] / b[i]
+    return result
+
+
+def bulk_calculate(operation_type: str, a, b) -> np.ndarray:
+    """
+    Apply one operation to many operand pairs.
+
+    Args:
+        operation_type: Type of operation (Add, Subtract, Multiply, Divide)
+        a: First operands (1-D array-like of floats)
+        b: Second operands (1-D array-like of floats, same length as a)
+
+    Returns:
+        Array of results, where result[i] equals
+        CalculationFactory.calculate(operation_type, a[i], b[i])
+
+    Raises:
+        ValueError: If operation_type is not supported (by the factory or by
+            the kernel), the operands are not equal-length 1-D arrays, or a
+            divisor is zero
+    """
+    # Reuse the factory lookup so unsupported types fail the same way
+    operation_class = type(CalculationFactory.create_operation(operation_type))
+    op_code = OPERATION_CODES.get(operation_class)
+    if op_code is None:
+        raise ValueError(f"Operation type {operation_type} has no bulk kernel")
+
+    a = np.ascontiguousarray(a, dtype=np.float64)
+    b = np.ascontiguousarray(b, dtype=np.float64)
+    if a.ndim != 1 or a.shape != b.shape:
+        raise ValueError("Operands must be one-dimensional arrays of equal length")
+    if op_code == OPERATION_CODES[DivideOperation] and not b.all():
+        raise ValueError("Division by zero is not allowed")
+
+    return _bulk_calc(op_code, a, b)
@@ -1,39 +1,70 @@
 """
 Main FastAPI application with user management endpoints.
 """
-from fastapi import FastAPI, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import asyncio
+from typing import Annotated
+from uuid import UUID
+
+import orjson
+from fastapi import Body, FastAPI, Depends, HTTPException, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import bindparam, insert, literal, select, union_all, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession, async_sessionmaker
+from starlette.background import BackgroundTask
 
-from app.database import get_db, engine, Base
+from app import user_cache
+from app.database import Settings, get_db, get_session_factory, engine, Base
 from app.models import User
 from app.schemas import UserCreate, UserRead, UserUpdate
-from app.security import hash_password, verify_password
+from app.security import HASH_POOL, hash_password, hash_passwords, needs_rehash, verify_password
+
+# Built once at import: SQLAlchemy's compiled cache then reuses the SQL
+# string and asyncpg its server-side prepared statement, so each login only
+# binds the username parameter
+USER_CREDENTIALS_STMT = (
+    select(User.id, User.password_hash)
+    .where(User.username == bindparam("username"))
+)
+
+# Upper bound on users per bulk request, limiting the body size and the
+# hashing one request can ask for (about 100 sequential hashes on a
+# one-worker pool). Logins are kept from queueing behind a batch by
+# hash_passwords' batch slots, not by this cap.
+BULK_CREATE_MAX_USERS = 100
 
-# Create all tables on startup
-Base.metadata.create_all(bind=engine)
+# Rows fetched per round trip when streaming the user list
+LIST_USERS_BATCH_SIZE = 100
+
+# Fixed liveness probe body, returned as-is without JSON encoding
+HEALTH_BODY = b'{"status":"healthy","message":"Application is running"}'
 
 app = FastAPI(
     title="Secure FastAPI Application",
     description="User management with secure password hashing and database integration",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson encodes UUID and datetime natively, far faster than stdlib json
+    default_response_class=ORJSONResponse
 )
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database tables on startup."""
-    Base.metadata.create_all(bind=engine)
+    """Initialize database tables on startup when AUTO_CREATE_TABLES is set."""
+    if Settings().auto_create_tables:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
 
 
 @app.get("/health", tags=["Health"])
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "message": "Application is running"}
+    return Response(content=HEALTH_BODY, media_type="application/json")
 
 
 @app.post("/users", response_model=UserRead, status_code=status.HTTP_201_CREATED, tags=["Users"])
-async def create_user(user_data: UserCreate, db: Session = Depends(get_db)) -> UserRead:
+async def create_user(user_data: UserCreate, db: AsyncSession = Depends(get_db)) -> UserRead:
     """
     Create a new user.
     
@@ -43,32 +74,41 @@ async def create_user(user_data: UserCreate, db: Session = Depends(get_db)) -> U
     
     Returns the created user without password_hash.
     """
-    try:
-        # Hash the password before storing
-        password_hash = hash_password(user_data.password)
-        
-        # Create new user instance
-        db_user = User(
+    # Hash the password before storing
+    password_hash = await asyncio.get_running_loop().run_in_executor(
+        HASH_POOL, hash_password, user_data.password
+    )
+    
+    # Insert unless the username or email is taken; RETURNING hands back
+    # the new row, so a conflict shows up as an empty result
+    stmt = (
+        pg_insert(User)
+        .values(
             username=user_data.username,
             email=user_data.email,
             password_hash=password_hash
         )
-        
-        # Add to database
-        db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
-        
-        return db_user
+        .on_conflict_do_nothing()
+        .returning(User)
+    )
+    result = await db.execute(stmt)
+    db_user = result.scalar_one_or_none()
     
-    except IntegrityError as e:
-        db.rollback()
-        if "username" in str(e):
+    if db_user is None:
+        # Identify which unique column the existing row collided on
+        conflicts = await db.execute(
+            union_all(
+                select(literal(1)).where(User.username == user_data.username),
+                select(literal(2)).where(User.email == user_data.email),
+            )
+        )
+        conflict_kinds = set(conflicts.scalars())
+        if 1 in conflict_kinds:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Username already exists"
             )
-        elif "email" in str(e):
+        elif 2 in conflict_kinds:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Email already exists"
@@ -77,12 +117,71 @@ async def create_user(user_data: UserCreate, db: Session = Depends(get_db)) -> U
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User creation failed due to data conflict"
         )
+    
+    await db.commit()
+    return db_user
+
+
+@app.post("/users/bulk", response_model=list[UserRead], status_code=status.HTTP_201_CREATED, tags=["Users"])
+async def create_users_bulk(
+    users_data: Annotated[list[UserCreate], Body(max_length=BULK_CREATE_MAX_USERS)],
+    allow_salt_reuse: bool = False,
+    db: AsyncSession = Depends(get_db)
+) -> list[UserRead]:
+    """
+    Create several users in one request.
+    
+    Passwords are hashed in parallel and all users are written with a
+    single multi-row INSERT and one commit. If any username or email is
+    already taken, or repeated within the batch, no users are created.
+    At most BULK_CREATE_MAX_USERS users may be sent per request.
+    
+    - **allow_salt_reuse**: Hash each distinct password in the batch once
+      and store the same hash for every user sharing it (default: false).
+      Faster for seeded batches, but the stored hashes reveal which of
+      these users share a password.
+    
+    Returns the created users, in request order, without password_hash.
+    """
+    if not users_data:
+        return []
+    
+    # Hash all passwords in parallel, waiting on a helper thread so the
+    # event loop stays free
+    password_hashes = await asyncio.to_thread(
+        hash_passwords,
+        [user_data.password for user_data in users_data],
+        allow_salt_reuse
+    )
+    
+    try:
+        result = await db.execute(
+            insert(User).returning(User, sort_by_parameter_order=True),
+            [
+                {
+                    "username": user_data.username,
+                    "email": user_data.email,
+                    "password_hash": password_hash,
+                }
+                for user_data, password_hash in zip(users_data, password_hashes)
+            ]
+        )
+        db_users = result.scalars().all()
+        await db.commit()
+        return db_users
+    
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Username or email already exists"
+        )
 
 
 @app.get("/users/{user_id}", response_model=UserRead, tags=["Users"])
-async def get_user(user_id: str, db: Session = Depends(get_db)) -> UserRead:
+async def get_user(user_id: UUID, db: AsyncSession = Depends(get_db)) -> UserRead:
     """Get a user by ID."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -92,43 +191,96 @@ async def get_user(user_id: str, db: Session = Depends(get_db)) -> UserRead:
 
 
 @app.get("/users", response_model=list[UserRead], tags=["Users"])
-async def list_users(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)) -> list[UserRead]:
+async def list_users(
+    skip: int = 0,
+    limit: int = 10,
+    session_factory: async_sessionmaker = Depends(get_session_factory)
+) -> StreamingResponse:
     """
     List all users with pagination.
     
     - **skip**: Number of users to skip (default: 0)
     - **limit**: Maximum number of users to return (default: 10)
+    
+    Rows are streamed from a server-side cursor in batches of
+    LIST_USERS_BATCH_SIZE, so memory stays flat for large limits.
+    """
+    # The session is not taken from get_db: dependency cleanup is not
+    # guaranteed to wait for a streamed body. It is closed by a background
+    # task instead, which Starlette runs even when the client disconnects
+    # before or during the body (the body generator may never be resumed)
+    db = session_factory()
+    try:
+        # Select only the UserRead columns so password_hash is never loaded
+        result = await db.stream(
+            select(User.id, User.username, User.email, User.created_at)
+            .offset(skip)
+            .limit(limit)
+            .execution_options(yield_per=LIST_USERS_BATCH_SIZE)
+        )
+    except BaseException:
+        await db.close()
+        raise
+    return StreamingResponse(
+        _stream_json_rows(db, result),
+        media_type="application/json",
+        background=BackgroundTask(db.close),
+    )
+
+
+async def _stream_json_rows(db: AsyncSession, result: AsyncResult):
+    """
+    Encode result rows as a JSON array, one batch of rows per chunk.
+    
+    The status line is sent with the first chunk, so a database error
+    after that point cannot become an error response: the client gets a
+    200 with a truncated (invalid) JSON body and the connection is aborted.
+    The error also skips the response's background task, so db is closed
+    here in that case.
     """
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    try:
+        yield b"["
+        separator = b""
+        async for rows in result.partitions():
+            yield separator + b",".join(orjson.dumps(row._asdict()) for row in rows)
+            separator = b","
+        yield b"]"
+    except Exception:
+        await db.close()
+        raise
 
 
 @app.put("/users/{user_id}", response_model=UserRead, tags=["Users"])
 async def update_user(
-    user_id: str,
+    user_id: UUID,
     user_data: UserUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> UserRead:
     """Update user information (username or email)."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
+    old_username = user.username
     try:
         if user_data.username is not None:
             user.username = user_data.username
         if user_data.email is not None:
             user.email = user_data.email
         
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
+        
+        # Cached credentials are keyed by username
+        if user.username != old_username:
+            user_cache.invalidate(old_username)
         return user
     
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         if "username" in str(e):
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
@@ -146,37 +298,58 @@ async def update_user(
 
 
 @app.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT, tags=["Users"])
-async def delete_user(user_id: str, db: Session = Depends(get_db)):
+async def delete_user(user_id: UUID, db: AsyncSession = Depends(get_db)):
     """Delete a user by ID."""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await db.commit()
+    user_cache.invalidate(user.username)
 
 
 @app.post("/verify-password", tags=["Security"])
-async def verify_user_password(username: str, password: str, db: Session = Depends(get_db)):
+async def verify_user_password(username: str, password: str, db: AsyncSession = Depends(get_db)):
     """
     Verify a user's password (for authentication purposes).
     
     Returns success if password is correct.
     """
-    user = db.query(User).filter(User.username == username).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
+    credentials = user_cache.get_credentials(username)
+    if credentials is None:
+        result = await db.execute(USER_CREDENTIALS_STMT, {"username": username})
+        row = result.first()
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        credentials = (row.id, row.password_hash)
+        user_cache.set_credentials(username, *credentials)
     
-    if not verify_password(password, user.password_hash):
+    user_id, password_hash = credentials
+    loop = asyncio.get_running_loop()
+    password_ok = await loop.run_in_executor(
+        HASH_POOL, verify_password, password, password_hash
+    )
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid password"
         )
     
+    # Upgrade legacy bcrypt (or outdated argon2) hashes now that the
+    # plain-text password is known, so later logins take the fast path
+    if needs_rehash(password_hash):
+        new_hash = await loop.run_in_executor(HASH_POOL, hash_password, password)
+        await db.execute(
+            update(User).where(User.id == user_id).values(password_hash=new_hash)
+        )
+        await db.commit()
+        user_cache.set_credentials(username, user_id, new_hash)
+    
     return {"message": "Password verified successfully"}
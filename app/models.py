@@ -2,29 +2,60 @@
 SQLAlchemy models for the application.
 """
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Float, ForeignKey, func
+from sqlalchemy import Column, String, DateTime, Float, ForeignKey, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
+import os
+import time
 import uuid
 
 from app.database import Base
 
 
+def uuid7() -> uuid.UUID:
+    """
+    Generate a time-ordered UUID (version 7, RFC 9562).
+    
+    The leading 48 bits hold the Unix time in milliseconds, so new keys sort
+    after existing ones and primary-key inserts append to the end of the
+    index instead of splitting random btree pages.
+    
+    Returns:
+        A new version 7 UUID
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80 | int.from_bytes(os.urandom(10), "big")
+    # Set the version (0111) and variant (10) bits
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return uuid.UUID(int=value)
+
+
 class User(Base):
     """
     User model with secure password storage and unique constraints.
     
     Attributes:
-        id: UUID primary key
+        id: Time-ordered UUID (v7) primary key
         username: Unique username (max 50 chars)
         email: Unique email address (max 100 chars)
-        password_hash: Hashed password using bcrypt
+        password_hash: Hashed password using argon2id (legacy rows may be bcrypt)
         created_at: Timestamp when user was created
     """
     __tablename__ = "users"
+    __table_args__ = (
+        # Unique username index that also carries id and password_hash, so
+        # the verify-password lookup is answered by an index-only scan
+        Index(
+            "ix_users_username",
+            "username",
+            unique=True,
+            postgresql_include=["id", "password_hash"],
+        ),
+    )
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
-    username = Column(String(50), unique=True, nullable=False, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    username = Column(String(50), nullable=False)
     email = Column(String(100), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
@@ -38,7 +69,7 @@ class Calculation(Base):
     Calculation model for storing arithmetic operations.
     
     Attributes:
-        id: UUID primary key
+        id: Time-ordered UUID (v7) primary key
         a: First operand (float)
         b: Second operand (float)
         type: Operation type (Add, Subtract, Multiply, Divide)
@@ -48,7 +79,7 @@ class Calculation(Base):
     """
     __tablename__ = "calculations"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     a = Column(Float, nullable=False)
     b = Column(Float, nullable=False)
     type = Column(String(20), nullable=False)
@@ -1,7 +1,7 @@
 """
 Pydantic schemas for request/response validation and serialization.
 """
-from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator, model_validator
 from datetime import datetime
 from typing import Optional
 from uuid import UUID
@@ -31,14 +31,15 @@ class UserCreate(BaseModel):
         description="Password must be at least 8 characters"
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "username": "johndoe",
                 "email": "john@example.com",
                 "password": "securepassword123"
             }
         }
+    )
 
 
 class UserRead(BaseModel):
@@ -53,9 +54,9 @@ class UserRead(BaseModel):
     email: str
     created_at: datetime
 
-    class Config:
-        from_attributes = True
-        json_schema_extra = {
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
             "example": {
                 "id": "550e8400-e29b-41d4-a716-446655440000",
                 "username": "johndoe",
@@ -63,6 +64,7 @@ class UserRead(BaseModel):
                 "created_at": "2024-01-01T12:00:00"
             }
         }
+    )
 
 
 class UserUpdate(BaseModel):
@@ -74,13 +76,14 @@ class UserUpdate(BaseModel):
     )
     email: Optional[EmailStr] = None
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "username": "newusername",
                 "email": "newemail@example.com"
             }
         }
+    )
 
 
 class OperationType(str, Enum):
@@ -109,14 +112,15 @@ class CalculationCreate(BaseModel):
             raise ValueError("Division by zero is not allowed")
         return self
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "a": 10.5,
                 "b": 5.0,
                 "type": "Add"
             }
         }
+    )
 
 
 class CalculationRead(BaseModel):
@@ -133,9 +137,9 @@ class CalculationRead(BaseModel):
     user_id: Optional[UUID]
     created_at: datetime
 
-    class Config:
-        from_attributes = True
-        json_schema_extra = {
+    model_config = ConfigDict(
+        from_attributes=True,
+        json_schema_extra={
             "example": {
                 "id": "550e8400-e29b-41d4-a716-446655440000",
                 "a": 10.5,
@@ -146,3 +150,4 @@ class CalculationRead(BaseModel):
                 "created_at": "2024-01-01T12:00:00"
             }
         }
+    )
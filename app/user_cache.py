@@ -0,0 +1,57 @@
+"""
+In-process cache of user credentials for password verification.
+
+Maps a username to the ``(id, password_hash)`` pair needed to verify a
+login, so repeated attempts for the same user skip the database lookup.
+Only those two fields are cached; ORM objects are never shared across
+sessions. Entries expire after a short TTL and are invalidated when a
+user is renamed or deleted.
+"""
+import threading
+from typing import Optional, Tuple
+from uuid import UUID
+
+from cachetools import TTLCache
+
+# Bounded LRU with a 30 second lifetime per entry
+_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+_lock = threading.Lock()
+
+
+def get_credentials(username: str) -> Optional[Tuple[UUID, str]]:
+    """
+    Look up cached credentials for a username.
+
+    Args:
+        username: Username to look up
+
+    Returns:
+        The cached ``(id, password_hash)`` pair, or None on a miss
+    """
+    with _lock:
+        return _cache.get(username)
+
+
+def set_credentials(username: str, user_id: UUID, password_hash: str) -> None:
+    """
+    Cache credentials for a username.
+
+    Args:
+        username: Username the credentials belong to
+        user_id: ID of the user
+        password_hash: Stored password hash of the user
+    """
+    with _lock:
+        _cache[username] = (user_id, password_hash)
+
+
+def invalidate(username: str) -> None:
+    """Remove any cached credentials for a username."""
+    with _lock:
+        _cache.pop(username, None)
+
+
+def clear() -> None:
+    """Remove all cached credentials."""
+    with _lock:
+        _cache.clear()
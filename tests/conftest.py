@@ -0,0 +1,24 @@
+"""
+Shared pytest configuration.
+"""
+import pytest
+from argon2 import PasswordHasher
+
+from app import security
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fast_password_hasher():
+    """
+    Hash passwords with minimal argon2id cost parameters during tests.
+    
+    Production settings take a sizeable fraction of a second per hash; the
+    code paths exercised are identical, only the work factor differs.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(
+            security,
+            "_password_hasher",
+            PasswordHasher(time_cost=1, memory_cost=8, parallelism=1)
+        )
+        yield
@@ -5,12 +5,16 @@ These tests use PostgreSQL for testing.
 """
 import pytest
 import os
-from sqlalchemy import create_engine
+import bcrypt
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 
-from app.main import app, Base
-from app.database import get_db
+from app import user_cache
+from app.main import app, Base, BULK_CREATE_MAX_USERS
+from app.database import get_db, get_session_factory, to_async_url
 from app.models import User, Calculation
 from app.factory import CalculationFactory
 
@@ -36,38 +40,76 @@ def setup_database():
 
 @pytest.fixture
 def db_session(setup_database):
-    """Provide a database session for each test."""
+    """
+    Provide a database session for each test.
+    
+    The session runs inside an outer transaction that is rolled back after
+    the test, so nothing it writes needs to be deleted. Commits made by the
+    test only release a SAVEPOINT within that transaction.
+    """
+    connection = setup_database.connect()
+    transaction = connection.begin()
+    
     TestingSessionLocal = sessionmaker(
         autocommit=False,
         autoflush=False,
-        bind=setup_database
+        bind=connection,
+        join_transaction_mode="create_savepoint"
     )
     
     db = TestingSessionLocal()
     
-    # Clear all data before each test
-    for table in reversed(Base.metadata.sorted_tables):
-        db.execute(table.delete())
-    db.commit()
-    
     yield db
     
     db.close()
+    transaction.rollback()
+    connection.close()
 
 
 @pytest.fixture
-def client(db_session):
-    """Provide a test client with database dependency override."""
-    def override_get_db():
-        try:
-            yield db_session
-        finally:
-            pass
-    
-    app.dependency_overrides[get_db] = override_get_db
+def client(setup_database):
+    """
+    Provide a test client with database dependency override.
+    
+    All requests share one async connection whose outer transaction is
+    rolled back after the test, the same way as db_session.
+    """
+    # NullPool so no asyncpg connection outlives the TestClient event loop
+    async_engine = create_async_engine(to_async_url(DATABASE_URL), poolclass=NullPool)
+    
+    async def open_connection():
+        connection = await async_engine.connect()
+        transaction = await connection.begin()
+        return connection, transaction
+    
+    async def close_connection(connection, transaction):
+        await transaction.rollback()
+        await connection.close()
+        await async_engine.dispose()
     
     with TestClient(app) as test_client:
+        # The connection must be opened on the event loop that serves requests
+        connection, transaction = test_client.portal.call(open_connection)
+        TestingAsyncSessionLocal = async_sessionmaker(
+            bind=connection,
+            autoflush=False,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint"
+        )
+        
+        async def override_get_db():
+            async with TestingAsyncSessionLocal() as session:
+                yield session
+        
+        app.dependency_overrides[get_db] = override_get_db
+        # GET /users opens its own session from the factory
+        app.dependency_overrides[get_session_factory] = lambda: TestingAsyncSessionLocal
+        # Usernames are reused across tests, so start from an empty cache
+        user_cache.clear()
+        
         yield test_client
+        
+        test_client.portal.call(close_connection, connection, transaction)
     
     app.dependency_overrides.clear()
 
@@ -79,8 +121,10 @@ class TestHealthEndpoint:
         """Test that health check endpoint returns 200."""
         response = client.get("/health")
         assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
         data = response.json()
         assert data["status"] == "healthy"
+        assert data["message"] == "Application is running"
 
 
 class TestUserCreation:
@@ -179,6 +223,108 @@ class TestUserCreation:
         assert response.status_code == 422
 
 
+class TestBulkUserCreation:
+    """Test bulk user creation endpoint."""
+    
+    def test_create_users_bulk_success(self, client):
+        """Test creating several users in one request."""
+        users_data = [
+            {
+                "username": f"user{i}",
+                "email": f"user{i}@example.com",
+                "password": "securepassword123"
+            }
+            for i in range(3)
+        ]
+        response = client.post("/users/bulk", json=users_data)
+        assert response.status_code == 201
+        data = response.json()
+        assert [u["username"] for u in data] == ["user0", "user1", "user2"]
+        assert all("password_hash" not in u for u in data)
+        
+        # Created users can log in with their password
+        response = client.post(
+            "/verify-password",
+            params={"username": "user1", "password": "securepassword123"}
+        )
+        assert response.status_code == 200
+    
+    def test_create_users_bulk_allow_salt_reuse(self, client):
+        """Test bulk creation hashing a shared password only once."""
+        users_data = [
+            {
+                "username": f"user{i}",
+                "email": f"user{i}@example.com",
+                "password": "securepassword123"
+            }
+            for i in range(3)
+        ]
+        response = client.post(
+            "/users/bulk",
+            params={"allow_salt_reuse": True},
+            json=users_data
+        )
+        assert response.status_code == 201
+        assert len(response.json()) == 3
+        
+        for i in range(3):
+            response = client.post(
+                "/verify-password",
+                params={"username": f"user{i}", "password": "securepassword123"}
+            )
+            assert response.status_code == 200
+    
+    def test_create_users_bulk_empty(self, client):
+        """Test that an empty batch creates nothing."""
+        response = client.post("/users/bulk", json=[])
+        assert response.status_code == 201
+        assert response.json() == []
+    
+    def test_create_users_bulk_over_limit_rejected(self, client):
+        """Test that batches larger than the cap are rejected unprocessed."""
+        users_data = [
+            {
+                "username": f"user{i}",
+                "email": f"user{i}@example.com",
+                "password": "securepassword123"
+            }
+            for i in range(BULK_CREATE_MAX_USERS + 1)
+        ]
+        response = client.post("/users/bulk", json=users_data)
+        assert response.status_code == 422
+        
+        # Nothing was created
+        assert client.get("/users").json() == []
+    
+    def test_create_users_bulk_duplicate_is_atomic(self, client):
+        """Test that a conflicting batch creates none of its users."""
+        client.post("/users", json={
+            "username": "johndoe",
+            "email": "john@example.com",
+            "password": "securepassword123"
+        })
+        
+        users_data = [
+            {
+                "username": "janedoe",
+                "email": "jane@example.com",
+                "password": "securepassword123"
+            },
+            {
+                "username": "johndoe",
+                "email": "john2@example.com",
+                "password": "securepassword123"
+            }
+        ]
+        response = client.post("/users/bulk", json=users_data)
+        assert response.status_code == 409
+        assert "already exists" in response.json()["detail"]
+        
+        # The non-conflicting user was not created either
+        response = client.get("/users")
+        assert [u["username"] for u in response.json()] == ["johndoe"]
+
+
 class TestUserRetrieval:
     """Test user retrieval endpoints."""
     
@@ -212,6 +358,63 @@ class TestUserRetrieval:
         data = response.json()
         assert len(data) == 2
     
+    def test_list_users_matches_user_read(self, client):
+        """Test that streamed list entries match the single-user response."""
+        user_data = {
+            "username": "johndoe",
+            "email": "john@example.com",
+            "password": "securepassword123"
+        }
+        user_id = client.post("/users", json=user_data).json()["id"]
+        
+        response = client.get("/users")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == [client.get(f"/users/{user_id}").json()]
+    
+    def test_list_users_closes_session_on_disconnect(self, client):
+        """Test that the streaming session is closed when the client goes away."""
+        closed = []
+        
+        class StubResult:
+            async def partitions(self):
+                yield []
+        
+        class StubSession:
+            async def stream(self, statement):
+                return StubResult()
+            
+            async def close(self):
+                closed.append(True)
+        
+        app.dependency_overrides[get_session_factory] = lambda: StubSession
+        
+        async def request_then_disconnect():
+            scope = {
+                "type": "http",
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": "/users",
+                "raw_path": b"/users",
+                "root_path": "",
+                "query_string": b"",
+                "headers": [],
+                "client": ("testclient", 50000),
+                "server": ("testserver", 80),
+            }
+            
+            async def receive():
+                return {"type": "http.disconnect"}
+            
+            async def send(message):
+                pass
+            
+            await app(scope, receive, send)
+        
+        client.portal.call(request_then_disconnect)
+        assert closed == [True]
+    
     def test_get_user_by_id(self, client):
         """Test retrieving a specific user by ID."""
         # Create a user
@@ -236,6 +439,11 @@ class TestUserRetrieval:
         assert response.status_code == 404
         assert "User not found" in response.json()["detail"]
 
+    def test_get_user_invalid_id(self, client):
+        """Test that a malformed user ID is rejected before querying."""
+        response = client.get("/users/not-a-uuid")
+        assert response.status_code == 422
+
 
 class TestPasswordVerification:
     """Test password verification."""
@@ -294,6 +502,85 @@ class TestPasswordVerification:
         assert response.status_code == 404
         assert "User not found" in response.json()["detail"]
 
+    def test_verify_password_after_username_change(self, client):
+        """Test that cached credentials do not survive a username change."""
+        user_data = {
+            "username": "johndoe",
+            "email": "john@example.com",
+            "password": "securepassword123"
+        }
+        user_id = client.post("/users", json=user_data).json()["id"]
+
+        # Populate the cache for the old username
+        params = {"username": "johndoe", "password": "securepassword123"}
+        assert client.post("/verify-password", params=params).status_code == 200
+
+        client.put(f"/users/{user_id}", json={"username": "newusername"})
+
+        response = client.post("/verify-password", params=params)
+        assert response.status_code == 404
+
+        params["username"] = "newusername"
+        response = client.post("/verify-password", params=params)
+        assert response.status_code == 200
+
+    def test_verify_password_after_delete(self, client):
+        """Test that cached credentials do not survive user deletion."""
+        user_data = {
+            "username": "johndoe",
+            "email": "john@example.com",
+            "password": "securepassword123"
+        }
+        user_id = client.post("/users", json=user_data).json()["id"]
+
+        # Populate the cache before deleting
+        params = {"username": "johndoe", "password": "securepassword123"}
+        assert client.post("/verify-password", params=params).status_code == 200
+
+        client.delete(f"/users/{user_id}")
+
+        response = client.post("/verify-password", params=params)
+        assert response.status_code == 404
+
+    def test_verify_password_upgrades_bcrypt_hash(self, client):
+        """Test that a legacy bcrypt hash is replaced with argon2id on login."""
+        user_data = {
+            "username": "johndoe",
+            "email": "john@example.com",
+            "password": "securepassword123"
+        }
+        client.post("/users", json=user_data)
+        legacy_hash = bcrypt.hashpw(b"securepassword123", bcrypt.gensalt(rounds=4)).decode()
+        
+        # The client fixture binds this factory to the test connection
+        session_factory = app.dependency_overrides[get_session_factory]()
+        
+        async def set_password_hash():
+            async with session_factory() as session:
+                await session.execute(
+                    update(User)
+                    .where(User.username == "johndoe")
+                    .values(password_hash=legacy_hash)
+                )
+                await session.commit()
+        
+        async def get_password_hash():
+            async with session_factory() as session:
+                return await session.scalar(
+                    select(User.password_hash).where(User.username == "johndoe")
+                )
+        
+        client.portal.call(set_password_hash)
+        
+        params = {"username": "johndoe", "password": "securepassword123"}
+        assert client.post("/verify-password", params=params).status_code == 200
+        assert client.portal.call(get_password_hash).startswith("$argon2id$")
+        
+        # Both the cached and the stored upgraded hash still verify
+        assert client.post("/verify-password", params=params).status_code == 200
+        user_cache.clear()
+        assert client.post("/verify-password", params=params).status_code == 200
+
 
 class TestUserUpdate:
     """Test user update endpoints."""
@@ -582,16 +869,23 @@ class TestCalculationIntegration:
     
     def test_calculation_ordering_by_created_at(self, db_session):
         """Test ordering calculations by creation time."""
-        import time
+        from datetime import datetime, timedelta
         
-        # Create calculations with slight time differences
-        for i in range(3):
+        # Every test runs in one outer transaction and PostgreSQL's now() is
+        # the transaction start time, so server defaults would all be equal.
+        # Set distinct timestamps explicitly, inserting them out of order.
+        base_time = datetime(2024, 1, 1, 12, 0, 0)
+        for i in (2, 0, 1):
             result = CalculationFactory.calculate("Add", float(i), 1.0)
-            calc = Calculation(a=float(i), b=1.0, type="Add", result=result)
+            calc = Calculation(
+                a=float(i),
+                b=1.0,
+                type="Add",
+                result=result,
+                created_at=base_time + timedelta(seconds=i)
+            )
             db_session.add(calc)
             db_session.commit()
-            if i < 2:
-                time.sleep(0.01)  # Small delay to ensure different timestamps
         
         # Query ordered by created_at
         calcs = db_session.query(Calculation).order_by(
@@ -600,5 +894,6 @@ class TestCalculationIntegration:
         
         assert len(calcs) == 3
         # Verify chronological order
+        assert [calc.a for calc in calcs] == [0.0, 1.0, 2.0]
         for i in range(len(calcs) - 1):
-            assert calcs[i].created_at <= calcs[i + 1].created_at
+            assert calcs[i].created_at < calcs[i + 1].created_at
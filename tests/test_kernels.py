@@ -0,0 +1,68 @@
+"""
+Unit tests for the compiled bulk calculation kernel.
+
+Skipped when the optional ``analytics`` dependencies are not installed.
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("numba")
+
+from app.factory import CalculationFactory, Operation
+from app.kernels import OPERATION_CODES, bulk_calculate
+
+
+class TestBulkCalculate:
+    """Test suite for the compiled bulk calculation kernel."""
+    
+    @pytest.mark.parametrize("operation_type", ["Add", "Subtract", "Multiply", "Divide"])
+    def test_bulk_matches_scalar_factory(self, operation_type):
+        """Test that bulk results match per-pair factory results."""
+        a = [10.0, -3.5, 0.0, 7.25]
+        b = [5.0, 2.0, 4.0, -0.5]
+        result = bulk_calculate(operation_type, a, b)
+        expected = [CalculationFactory.calculate(operation_type, x, y) for x, y in zip(a, b)]
+        assert result.tolist() == expected
+    
+    def test_every_factory_operation_has_kernel_code(self):
+        """Test that the kernel covers all operations registered in the factory."""
+        for operation_type in CalculationFactory.get_supported_operations():
+            operation_class = type(CalculationFactory.create_operation(operation_type))
+            assert operation_class in OPERATION_CODES
+    
+    def test_bulk_returns_float_array(self):
+        """Test that bulk results are a float64 array of the input length."""
+        result = bulk_calculate("Add", np.arange(1000), np.ones(1000))
+        assert result.dtype == np.float64
+        assert result.shape == (1000,)
+        assert result[999] == 1000.0
+    
+    def test_bulk_empty_input(self):
+        """Test that empty operands produce an empty result."""
+        assert bulk_calculate("Multiply", [], []).shape == (0,)
+    
+    def test_bulk_divide_by_zero_raises_error(self):
+        """Test that any zero divisor raises ValueError."""
+        with pytest.raises(ValueError, match="Division by zero is not allowed"):
+            bulk_calculate("Divide", [1.0, 2.0], [1.0, 0.0])
+    
+    def test_bulk_unsupported_operation_raises_error(self):
+        """Test that an unsupported operation type raises ValueError."""
+        with pytest.raises(ValueError, match="Unsupported operation type"):
+            bulk_calculate("Modulo", [1.0], [1.0])
+    
+    def test_bulk_operation_without_kernel_raises_error(self, monkeypatch):
+        """Test that a factory operation with no kernel code raises ValueError."""
+        class PowerOperation(Operation):
+            def calculate(self, a: float, b: float) -> float:
+                return a ** b
+        
+        operations = {**CalculationFactory._operations, "Power": PowerOperation}
+        monkeypatch.setattr(CalculationFactory, "_operations", operations)
+        with pytest.raises(ValueError, match="no bulk kernel"):
+            bulk_calculate("Power", [2.0], [3.0])
+    
+    def test_bulk_mismatched_lengths_raise_error(self):
+        """Test that operands of different lengths raise ValueError."""
+        with pytest.raises(ValueError, match="equal length"):
+            bulk_calculate("Add", [1.0, 2.0], [1.0])
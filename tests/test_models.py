@@ -0,0 +1,35 @@
+"""
+Unit tests for model helpers.
+"""
+import time
+
+from app.models import uuid7
+
+
+class TestUUID7:
+    """Test suite for time-ordered UUID generation."""
+    
+    def test_uuid7_version_and_variant(self):
+        """Test that generated UUIDs carry the v7 version and RFC variant."""
+        value = uuid7()
+        assert value.version == 7
+        assert value.variant == "specified in RFC 4122"
+    
+    def test_uuid7_embeds_current_timestamp(self):
+        """Test that the leading 48 bits hold the Unix time in milliseconds."""
+        before = time.time_ns() // 1_000_000
+        value = uuid7()
+        after = time.time_ns() // 1_000_000
+        assert before <= value.int >> 80 <= after
+    
+    def test_uuid7_sorts_by_creation_time(self):
+        """Test that UUIDs from later milliseconds sort after earlier ones."""
+        first = uuid7()
+        time.sleep(0.002)
+        second = uuid7()
+        assert first < second
+    
+    def test_uuid7_is_unique(self):
+        """Test that UUIDs generated in quick succession differ."""
+        values = {uuid7() for _ in range(1000)}
+        assert len(values) == 1000
@@ -1,8 +1,14 @@
 """
 Unit tests for password hashing and security utilities.
 """
+import threading
+import time
+
+import bcrypt
 import pytest
-from app.security import hash_password, verify_password
+from argon2 import PasswordHasher
+from app import security
+from app.security import hash_password, hash_passwords, needs_rehash, verify_password
 
 
 class TestPasswordHashing:
@@ -37,6 +43,97 @@ class TestPasswordHashing:
         """Test that hashing non-string raises ValueError."""
         with pytest.raises(ValueError, match="Password must be a non-empty string"):
             hash_password(12345)
+    
+    def test_hash_password_uses_argon2id(self):
+        """Test that new hashes are produced with argon2id."""
+        hashed = hash_password("testpassword123")
+        assert hashed.startswith("$argon2id$")
+
+
+class TestBatchPasswordHashing:
+    """Test suite for hashing several passwords at once."""
+    
+    def test_hash_passwords_preserves_order(self):
+        """Test that each hash matches the password at the same position."""
+        passwords = ["firstpassword", "secondpassword", "thirdpassword"]
+        hashes = hash_passwords(passwords)
+        assert len(hashes) == 3
+        for password, hashed in zip(passwords, hashes):
+            assert verify_password(password, hashed) is True
+    
+    def test_hash_passwords_unique_salts_by_default(self):
+        """Test that repeated passwords still get distinct hashes by default."""
+        hashes = hash_passwords(["samepassword", "samepassword"])
+        assert hashes[0] != hashes[1]
+    
+    def test_hash_passwords_allow_salt_reuse(self):
+        """Test that repeated passwords share one hash when reuse is allowed."""
+        passwords = ["samepassword", "otherpassword", "samepassword"]
+        hashes = hash_passwords(passwords, allow_salt_reuse=True)
+        assert hashes[0] == hashes[2]
+        assert hashes[0] != hashes[1]
+        for password, hashed in zip(passwords, hashes):
+            assert verify_password(password, hashed) is True
+    
+    def test_hash_passwords_empty_list(self):
+        """Test that an empty batch returns an empty list."""
+        assert hash_passwords([]) == []
+    
+    def test_hash_passwords_invalid_password_raises_error(self):
+        """Test that an invalid password in the batch raises ValueError."""
+        with pytest.raises(ValueError, match="Password must be a non-empty string"):
+            hash_passwords(["validpassword", ""])
+    
+    def test_single_hash_not_queued_behind_whole_batch(self, monkeypatch):
+        """Test that a login submitted mid-batch runs before the batch ends."""
+        def slow_hash(password):
+            time.sleep(0.05)
+            return password
+        
+        monkeypatch.setattr(security, "hash_password", slow_hash)
+        # About 1 second of hashing however many workers the pool has
+        batch = threading.Thread(
+            target=hash_passwords, args=(["password"] * 20 * security.HASH_POOL_SIZE,)
+        )
+        batch.start()
+        time.sleep(0.1)
+        
+        started = time.monotonic()
+        security.HASH_POOL.submit(slow_hash, "login").result()
+        waited = time.monotonic() - started
+        batch_still_running = batch.is_alive()
+        batch.join()
+        
+        # Only the batch hashes already queued (one per worker) go first
+        assert batch_still_running
+        assert waited < 0.5
+
+
+class TestHashPoolSizing:
+    """Test suite for sizing the hashing thread pool."""
+    
+    @pytest.mark.parametrize("cpus, workers", [(1, 1), (2, 1), (4, 1), (7, 1), (8, 2), (16, 4)])
+    def test_pool_size_accounts_for_argon2_lanes(self, monkeypatch, cpus, workers):
+        """Test that pool workers times argon2 lanes do not exceed the CPUs."""
+        monkeypatch.setattr(security.os, "sched_getaffinity", lambda pid: set(range(cpus)), raising=False)
+        monkeypatch.setattr(security.os, "cpu_count", lambda: 64)
+        assert security._hash_pool_size() == workers
+    
+    def test_pool_size_falls_back_to_cpu_count(self, monkeypatch):
+        """Test sizing on platforms without sched_getaffinity."""
+        monkeypatch.delattr(security.os, "sched_getaffinity", raising=False)
+        monkeypatch.setattr(security.os, "cpu_count", lambda: 8)
+        assert security._hash_pool_size() == 2
+    
+    def test_pool_size_with_unknown_cpu_count(self, monkeypatch):
+        """Test that an unknown CPU count still yields one worker."""
+        monkeypatch.delattr(security.os, "sched_getaffinity", raising=False)
+        monkeypatch.setattr(security.os, "cpu_count", lambda: None)
+        assert security._hash_pool_size() == 1
+    
+    def test_pool_uses_computed_size(self):
+        """Test that HASH_POOL is created with HASH_POOL_SIZE workers."""
+        assert security.HASH_POOL._max_workers == security.HASH_POOL_SIZE
 
 
 class TestPasswordVerification:
@@ -101,3 +198,39 @@ class TestPasswordVerification:
         hashed = hash_password(password)
         assert verify_password(password, hashed) is True
         assert verify_password("WrongPassword", hashed) is False
+    
+    def test_verify_password_legacy_bcrypt_hash(self):
+        """Test that hashes created with bcrypt still verify."""
+        password = "testpassword123"
+        legacy_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=4)).decode('utf-8')
+        assert verify_password(password, legacy_hash) is True
+        assert verify_password("wrongpassword", legacy_hash) is False
+    
+    def test_verify_password_legacy_bcrypt_2a_prefix(self):
+        """Test that older $2a$ bcrypt hashes still verify."""
+        password = "testpassword123"
+        legacy_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=4, prefix=b"2a")).decode('utf-8')
+        assert legacy_hash.startswith("$2a$")
+        assert verify_password(password, legacy_hash) is True
+
+
+class TestNeedsRehash:
+    """Test suite for detecting hashes that should be upgraded."""
+    
+    def test_current_hash_does_not_need_rehash(self):
+        """Test that a freshly made hash is up to date."""
+        assert needs_rehash(hash_password("testpassword123")) is False
+    
+    def test_bcrypt_hash_needs_rehash(self):
+        """Test that legacy bcrypt hashes are flagged for upgrade."""
+        legacy_hash = bcrypt.hashpw(b"testpassword123", bcrypt.gensalt(rounds=4)).decode('utf-8')
+        assert needs_rehash(legacy_hash) is True
+    
+    def test_outdated_argon2_parameters_need_rehash(self):
+        """Test that argon2 hashes with other cost parameters are flagged."""
+        weak_hash = PasswordHasher(time_cost=2, memory_cost=16, parallelism=2).hash("testpassword123")
+        assert needs_rehash(weak_hash) is True
+    
+    def test_invalid_hash_does_not_need_rehash(self):
+        """Test that unrecognized hash formats are left alone."""
+        assert needs_rehash("invalihashformat") is False
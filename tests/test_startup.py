@@ -0,0 +1,54 @@
+"""
+Unit tests for the application startup hook.
+"""
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app import main
+from app.database import Base
+
+
+class _RecordingConnection:
+    """Stand-in connection that records functions passed to run_sync."""
+    
+    def __init__(self, calls):
+        self.calls = calls
+    
+    async def run_sync(self, fn):
+        self.calls.append(fn)
+
+
+class _RecordingEngine:
+    """Stand-in engine whose begin() yields a recording connection."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    @asynccontextmanager
+    async def begin(self):
+        yield _RecordingConnection(self.calls)
+
+
+@pytest.fixture
+def recording_engine(monkeypatch):
+    """Replace the application engine so startup issues no real DDL."""
+    engine = _RecordingEngine()
+    monkeypatch.setattr(main, "engine", engine)
+    return engine
+
+
+class TestStartupTableCreation:
+    """Test suite for the AUTO_CREATE_TABLES startup guard."""
+    
+    async def test_creates_tables_when_enabled(self, monkeypatch, recording_engine):
+        """Test that create_all runs when AUTO_CREATE_TABLES is set."""
+        monkeypatch.setenv("AUTO_CREATE_TABLES", "1")
+        await main.startup_event()
+        assert recording_engine.calls == [Base.metadata.create_all]
+    
+    async def test_skips_tables_when_disabled(self, monkeypatch, recording_engine):
+        """Test that create_all is skipped when AUTO_CREATE_TABLES is off."""
+        monkeypatch.setenv("AUTO_CREATE_TABLES", "0")
+        await main.startup_event()
+        assert recording_engine.calls == []
@@ -0,0 +1,47 @@
+"""
+Unit tests for the user credentials cache.
+"""
+import pytest
+from uuid import uuid4
+
+from app import user_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    """Start and end every test with an empty cache."""
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+class TestUserCache:
+    """Test suite for caching (id, password_hash) pairs by username."""
+    
+    def test_get_credentials_miss_returns_none(self):
+        """Test that an unknown username is a cache miss."""
+        assert user_cache.get_credentials("johndoe") is None
+    
+    def test_set_then_get_credentials(self):
+        """Test that cached credentials are returned on a hit."""
+        user_id = uuid4()
+        user_cache.set_credentials("johndoe", user_id, "hash")
+        assert user_cache.get_credentials("johndoe") == (user_id, "hash")
+    
+    def test_invalidate_removes_entry(self):
+        """Test that invalidating a username removes its credentials."""
+        user_cache.set_credentials("johndoe", uuid4(), "hash")
+        user_cache.invalidate("johndoe")
+        assert user_cache.get_credentials("johndoe") is None
+    
+    def test_invalidate_unknown_username_is_noop(self):
+        """Test that invalidating a missing username does not raise."""
+        user_cache.invalidate("nonexistent")
+    
+    def test_clear_removes_all_entries(self):
+        """Test that clear empties the cache."""
+        user_cache.set_credentials("user1", uuid4(), "hash1")
+        user_cache.set_credentials("user2", uuid4(), "hash2")
+        user_cache.clear()
+        assert user_cache.get_credentials("user1") is None
+        assert user_cache.get_credentials("user2") is None